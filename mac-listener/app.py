@@ -2,17 +2,21 @@
 Mac listener service for opening apps, URLs, and tmux presets.
 """
 
+import asyncio
+import functools
 import hashlib
 import hmac
 import json
 import logging
+import os
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 from urllib.parse import urlparse, quote
-import subprocess
 
-from quart import Quart, jsonify, request
+from quart import Quart, Response, g, jsonify, request
 
 from config import Config
 
@@ -26,6 +30,19 @@ logger = logging.getLogger(__name__)
 app = Quart(__name__)
 app.config.from_object(Config)
 
+# Parsed presets.json keyed by mtime so repeat spawns skip the disk read.
+_PRESETS_CACHE: Optional[Tuple[int, Mapping[str, Dict[str, Any]]]] = None
+_PRESETS_LOCK = threading.Lock()
+
+# Fire-and-forget subprocess tasks, held so they are not garbage collected.
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+# Keyed HMAC state, copied per request so the key pads are derived once.
+_HMAC_TEMPLATE = (
+    hmac.new(Config.SHARED_SECRET.encode('utf-8'), b'', hashlib.sha256)
+    if Config.SHARED_SECRET else None
+)
+
 
 def _get_client_ip() -> str:
     forwarded = request.headers.get('X-Forwarded-For', '')
@@ -41,7 +58,7 @@ def _allowlist_ok(ip: str) -> bool:
 
 
 def _signature_ok(body: bytes, timestamp: str, signature: str) -> bool:
-    if not Config.SHARED_SECRET:
+    if _HMAC_TEMPLATE is None:
         return False
     try:
         ts = int(timestamp)
@@ -49,41 +66,70 @@ def _signature_ok(body: bytes, timestamp: str, signature: str) -> bool:
         return False
     if abs(time.time() - ts) > Config.MAX_SKEW_SECONDS:
         return False
-    message = f'{timestamp}.'.encode('utf-8') + body
-    digest = hmac.new(
-        Config.SHARED_SECRET.encode('utf-8'),
-        message,
-        hashlib.sha256
-    ).hexdigest()
-    return hmac.compare_digest(digest, signature)
+    try:
+        expected = bytes.fromhex(signature)
+    except (TypeError, ValueError):
+        return False
+    if len(expected) != _HMAC_TEMPLATE.digest_size:
+        return False
+    mac = _HMAC_TEMPLATE.copy()
+    mac.update(timestamp.encode('utf-8'))
+    mac.update(b'.')
+    mac.update(body)
+    return hmac.compare_digest(mac.digest(), expected)
+
+
+async def _read_body_bytes() -> bytes:
+    # Read once per request; the security hook only needs the raw bytes.
+    body = g.get('wm_body')
+    if body is None:
+        body = await request.get_data() or b''
+        g.wm_body = body
+    return body
 
 
 async def _read_json_body() -> Tuple[Optional[Dict[str, Any]], bytes]:
-    body = await request.get_data() or b''
-    if not body:
-        return None, body
-    try:
-        return json.loads(body.decode('utf-8')), body
-    except json.JSONDecodeError:
-        return None, body
+    # Parsed lazily, and only once, by the route that needs the dict.
+    cached = g.get('wm_parsed')
+    if cached is not None:
+        return cached
+    body = await _read_body_bytes()
+    data = None
+    if body:
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except json.JSONDecodeError:
+            data = None
+    g.wm_parsed = (data, body)
+    return data, body
+
+
+def _json_bytes(payload: Dict[str, Any]) -> bytes:
+    # Same encoding as jsonify, so cached bodies are byte-identical.
+    return json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8') + b'\n'
+
+
+_HEALTH_BODY = _json_bytes({'status': 'healthy', 'service': 'mac-listener'})
+
+
+@functools.lru_cache(maxsize=128)
+def _error_body(message: str) -> bytes:
+    return _json_bytes({'success': False, 'message': message})
 
 
 def _error(message: str, status: int = 400):
-    return jsonify({'success': False, 'message': message}), status
+    return Response(_error_body(message), status=status, mimetype='application/json')
 
 
 def _normalize_path(path_str: str) -> Optional[Path]:
     if not path_str:
         return None
     path = Path(path_str).expanduser().resolve()
-    if not Config.ALLOWED_ROOTS:
+    if not Config.ALLOWED_ROOT_STRS:
+        return path
+    candidate = str(path) + os.sep
+    if any(candidate.startswith(root) for root in Config.ALLOWED_ROOT_STRS):
         return path
-    for root in Config.ALLOWED_ROOTS:
-        try:
-            path.relative_to(root)
-            return path
-        except ValueError:
-            continue
     return None
 
 
@@ -96,27 +142,44 @@ def _valid_obsidian_file(file_path: str) -> bool:
     return '..' not in candidate.parts
 
 
-def _open_app_with_path(app_name: str, path: Path) -> Tuple[bool, str]:
+async def _run(cmd: List[str]) -> Tuple[int, str]:
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    return process.returncode, stderr.decode('utf-8', 'replace').strip()
+
+
+def _failure(returncode: int, stderr: str) -> str:
+    return stderr or f'exit status {returncode}'
+
+
+async def _open_app_with_path(app_name: str, path: Path) -> Tuple[bool, str]:
     if not path.exists():
         return False, f'Path not found: {path}'
-    try:
-        subprocess.run(
-            ['open', '-a', app_name, str(path)],
-            check=True
-        )
-    except subprocess.CalledProcessError as exc:
-        return False, f'Failed to open {app_name}: {exc}'
+    returncode, stderr = await _run(['open', '-a', app_name, str(path)])
+    if returncode != 0:
+        return False, f'Failed to open {app_name}: {_failure(returncode, stderr)}'
     return True, f'Opened {app_name}'
 
 
 def _activate_app(app_name: str) -> None:
-    subprocess.run(
-        ['osascript', '-e', f'tell application "{app_name}" to activate'],
-        check=False
+    task = asyncio.create_task(
+        _run(['osascript', '-e', f'tell application "{app_name}" to activate'])
     )
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_finish_background_task)
+
+
+def _finish_background_task(task: asyncio.Task) -> None:
+    _BACKGROUND_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error('Background command failed: %s', task.exception())
 
 
-def _open_url(url: str, app_name: Optional[str]) -> Tuple[bool, str]:
+async def _open_url(url: str, app_name: Optional[str]) -> Tuple[bool, str]:
     if not url:
         return False, 'Missing url'
     parsed = urlparse(url)
@@ -128,45 +191,57 @@ def _open_url(url: str, app_name: Optional[str]) -> Tuple[bool, str]:
             return False, f'Browser app not allowed: {app_name}'
         cmd += ['-a', app_name]
     cmd.append(url)
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as exc:
-        return False, f'Failed to open url: {exc}'
+    returncode, stderr = await _run(cmd)
+    if returncode != 0:
+        return False, f'Failed to open url: {_failure(returncode, stderr)}'
     return True, 'Opened url'
 
 
-def _open_obsidian_uri(vault: str, file_path: str) -> Tuple[bool, str, str]:
+@functools.lru_cache(maxsize=64)
+def _encoded_vault(vault: str) -> str:
+    # Vaults come from the allowlist, so this is effectively a constant.
+    return quote(vault)
+
+
+async def _open_obsidian_uri(vault: str, file_path: str) -> Tuple[bool, str, str]:
     if vault not in Config.OBSIDIAN_VAULTS:
         return False, f'Vault not allowed: {vault}', ''
     if not _valid_obsidian_file(file_path):
         return False, 'Invalid Obsidian file path', ''
-    encoded_path = quote(file_path)
-    uri = f'obsidian://open?vault={quote(vault)}&file={encoded_path}'
-    try:
-        subprocess.run(['open', uri], check=True)
-    except subprocess.CalledProcessError as exc:
-        return False, f'Failed to open obsidian uri: {exc}', uri
+    uri = f'obsidian://open?vault={_encoded_vault(vault)}&file={quote(file_path)}'
+    returncode, stderr = await _run(['open', uri])
+    if returncode != 0:
+        return False, f'Failed to open obsidian uri: {_failure(returncode, stderr)}', uri
     _activate_app('Obsidian')
     return True, 'Opened Obsidian via URI', uri
 
 
-def _load_presets() -> Dict[str, Dict[str, Any]]:
+def _load_presets() -> Mapping[str, Dict[str, Any]]:
+    global _PRESETS_CACHE
     presets_path = Config.PRESETS_PATH
     if not presets_path.is_absolute():
         presets_path = Path(__file__).parent / presets_path
-    if not presets_path.exists():
-        logger.error('Presets file not found: %s', presets_path)
-        return {}
     try:
-        with open(presets_path, 'r', encoding='utf-8') as handle:
-            data = json.load(handle)
-    except json.JSONDecodeError as exc:
-        logger.error('Invalid presets JSON: %s', exc)
-        return {}
-    return data
+        mtime_ns = os.stat(presets_path).st_mtime_ns
+    except FileNotFoundError:
+        logger.error('Presets file not found: %s', presets_path)
+        return MappingProxyType({})
+    with _PRESETS_LOCK:
+        cached = _PRESETS_CACHE
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        try:
+            with open(presets_path, 'r', encoding='utf-8') as handle:
+                data = json.load(handle)
+        except json.JSONDecodeError as exc:
+            logger.error('Invalid presets JSON: %s', exc)
+            return MappingProxyType({})
+        presets = MappingProxyType(data)
+        _PRESETS_CACHE = (mtime_ns, presets)
+    return presets
 
 
-def _spawn_tmux_preset(name: str, cwd: Path) -> Tuple[bool, str]:
+async def _spawn_tmux_preset(name: str, cwd: Path) -> Tuple[bool, str]:
     presets = _load_presets()
     preset = presets.get(name)
     if not preset:
@@ -177,27 +252,22 @@ def _spawn_tmux_preset(name: str, cwd: Path) -> Tuple[bool, str]:
 
     session = preset.get('session', name)
 
-    try:
-        has_session = subprocess.run(
-            ['tmux', 'has-session', '-t', session],
-            check=False
-        )
-        if has_session.returncode != 0:
-            subprocess.run(
-                ['tmux', 'new-session', '-d', '-s', session, '-c', str(cwd), command],
-                check=True
-            )
-    except subprocess.CalledProcessError as exc:
-        return False, f'Failed to create tmux session: {exc}'
-
-    _activate_app(Config.TERMINAL_APP)
-    subprocess.run(
+    # A single new-session call; an existing session is reported as a
+    # duplicate, which saves a separate has-session probe.
+    returncode, stderr = await _run(
+        ['tmux', 'new-session', '-d', '-s', session, '-c', str(cwd), command]
+    )
+    if returncode != 0 and not stderr.startswith('duplicate session'):
+        return False, f'Failed to create tmux session: {_failure(returncode, stderr)}'
+
+    await _run(
         [
             'osascript',
             '-e',
+            f'tell application "{Config.TERMINAL_APP}" to activate',
+            '-e',
             f'tell application "{Config.TERMINAL_APP}" to do script "tmux attach -t {session}"'
-        ],
-        check=False
+        ]
     )
     return True, f'Tmux session ready: {session}'
 
@@ -219,11 +289,11 @@ def _require_security(body: bytes) -> Optional[Tuple[Dict[str, Any], int]]:
 async def enforce_security():
     if request.method == 'GET':
         return None
-    _, body = await _read_json_body()
+    body = await _read_body_bytes()
     security_error = _require_security(body)
     if security_error:
         payload, status = security_error
-        return jsonify(payload), status
+        return _error(payload['message'], status)
     return None
 
 
@@ -238,7 +308,7 @@ async def open_obsidian():
     file_path = data.get('file')
 
     if vault and file_path:
-        ok, message, uri = _open_obsidian_uri(vault, file_path)
+        ok, message, uri = await _open_obsidian_uri(vault, file_path)
         if ok:
             return jsonify({'success': True, 'message': message, 'uri': uri})
         return _error(message)
@@ -250,7 +320,7 @@ async def open_obsidian():
     if not path:
         return _error('Path not allowed', 403)
 
-    ok, message = _open_app_with_path('Obsidian', path)
+    ok, message = await _open_app_with_path('Obsidian', path)
     _activate_app('Obsidian')
     if ok:
         return jsonify({'success': True, 'message': message, 'path': str(path)})
@@ -271,7 +341,7 @@ async def open_cursor():
     if not path:
         return _error('Path not allowed', 403)
 
-    ok, message = _open_app_with_path('Cursor', path)
+    ok, message = await _open_app_with_path('Cursor', path)
     _activate_app('Cursor')
     if ok:
         return jsonify({'success': True, 'message': message, 'path': str(path)})
@@ -286,7 +356,7 @@ async def open_url():
 
     url = data.get('url')
     app_name = data.get('app')
-    ok, message = _open_url(url, app_name)
+    ok, message = await _open_url(url, app_name)
     if ok:
         return jsonify({'success': True, 'message': message, 'url': url})
     return _error(message)
@@ -309,7 +379,7 @@ async def spawn_agent():
     if not cwd:
         return _error('cwd not allowed', 403)
 
-    ok, message = _spawn_tmux_preset(preset, cwd)
+    ok, message = await _spawn_tmux_preset(preset, cwd)
     if ok:
         return jsonify({'success': True, 'message': message, 'preset': preset})
     return _error(message)
@@ -317,7 +387,7 @@ async def spawn_agent():
 
 @app.route('/health', methods=['GET'])
 async def health_check():
-    return jsonify({'status': 'healthy', 'service': 'mac-listener'}), 200
+    return Response(_HEALTH_BODY, status=200, mimetype='application/json')
 
 
 if __name__ == '__main__':
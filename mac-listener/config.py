@@ -4,7 +4,7 @@ Configuration for the Mac listener service.
 
 import os
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, Tuple
 
 
 class Config:
@@ -18,35 +18,40 @@ class Config:
     # Security: allowlist + HMAC
     SHARED_SECRET = os.getenv('WM_MAC_SHARED_SECRET', '')
     ALLOWLIST_REQUIRED = os.getenv('WM_MAC_ALLOWLIST_REQUIRED', 'true').lower() == 'true'
-    ALLOWED_IPS = [
+    ALLOWED_IPS: FrozenSet[str] = frozenset(
         ip.strip() for ip in os.getenv('WM_MAC_ALLOWED_IPS', '').split(',')
         if ip.strip()
-    ]
+    )
     SIGNATURE_REQUIRED = os.getenv('WM_MAC_SIGNATURE_REQUIRED', 'true').lower() == 'true'
     MAX_SKEW_SECONDS = int(os.getenv('WM_MAC_MAX_SKEW_SECONDS', '300'))
 
     # Safe path constraints
-    ALLOWED_ROOTS: List[Path] = [
+    ALLOWED_ROOTS: Tuple[Path, ...] = tuple(
         Path(p.strip()).expanduser().resolve()
         for p in os.getenv('WM_MAC_ALLOWED_ROOTS', '').split(':')
         if p.strip()
-    ]
+    )
+    # Roots as separator-terminated strings for a plain prefix check
+    ALLOWED_ROOT_STRS: Tuple[str, ...] = tuple(
+        str(root) if str(root).endswith(os.sep) else str(root) + os.sep
+        for root in ALLOWED_ROOTS
+    )
 
     # Obsidian configuration
-    OBSIDIAN_VAULTS = [
+    OBSIDIAN_VAULTS: FrozenSet[str] = frozenset(
         v.strip() for v in os.getenv('WM_MAC_OBSIDIAN_VAULTS', 'WINTERMUTE').split(',')
         if v.strip()
-    ]
+    )
 
     # URL handling
-    ALLOWED_URL_SCHEMES = [
+    ALLOWED_URL_SCHEMES: FrozenSet[str] = frozenset(
         s.strip() for s in os.getenv('WM_MAC_ALLOWED_URL_SCHEMES', 'http,https').split(',')
         if s.strip()
-    ]
-    ALLOWED_URL_APPS = [
+    )
+    ALLOWED_URL_APPS: FrozenSet[str] = frozenset(
         a.strip() for a in os.getenv('WM_MAC_ALLOWED_URL_APPS', '').split(',')
         if a.strip()
-    ]
+    )
 
     # Agent presets
     PRESETS_PATH = Path(os.getenv('WM_MAC_PRESETS_PATH', 'presets.json'))
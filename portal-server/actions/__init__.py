@@ -2,10 +2,11 @@
 Action registry and base classes for portal actions.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 import logging
 
-from actions.daily_note import DailyNoteAction
+from actions.daily_note import DailyNoteAction, drain_git_tasks
 from actions.hydration import HydrationAction
 
 logger = logging.getLogger(__name__)
@@ -14,18 +15,25 @@ logger = logging.getLogger(__name__)
 class ActionRegistry:
     """Registry for portal actions."""
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, max_workers: Optional[int] = None):
         """
         Initialize the action registry.
         
         Args:
             repo_path: Path to the wintermute repository
+            max_workers: Size of the thread pool for blocking action I/O
         """
         self.repo_path = repo_path
+        # Actions get their own pool so vault file I/O never queues behind
+        # (or starves) the loop's default executor.
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='portal-action',
+        )
         self.actions = {
-            'view_daily': DailyNoteAction(repo_path, gitea_mode='view'),
-            'edit_daily': DailyNoteAction(repo_path, gitea_mode='edit'),
-            'add_water': HydrationAction(repo_path),
+            'view_daily': DailyNoteAction(repo_path, gitea_mode='view', executor=self.executor),
+            'edit_daily': DailyNoteAction(repo_path, gitea_mode='edit', executor=self.executor),
+            'add_water': HydrationAction(repo_path, executor=self.executor),
         }
     
     async def execute(self, action_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -50,12 +58,24 @@ class ActionRegistry:
         action = self.actions[action_name]
         
         try:
-            result = await action.execute(data)
-            return result
+            return await action.execute(data)
         except Exception as e:
-            logger.exception(f"Error executing action {action_name}: {e}")
+            from config import Config
+
+            # Actions return error dicts for expected failures; only build
+            # a traceback for unexpected ones when debugging.
+            logger.error(f"Error executing action {action_name}: {e}", exc_info=Config.DEBUG)
             return {
                 'success': False,
                 'error': str(e),
                 'message': f'Failed to execute action {action_name}'
             }
+
+    async def drain(self) -> None:
+        """
+        Wait for background work started by actions (e.g. git pushes).
+
+        The executor is left running: the registry outlives a single
+        serving cycle, and its idle threads are joined at interpreter exit.
+        """
+        await drain_git_tasks()
@@ -4,91 +4,136 @@ Daily note creation action.
 
 import asyncio
 import logging
-from datetime import datetime
+from concurrent.futures import Executor
+from datetime import date
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, TextIO, TypeVar
 import shutil
+import shlex
 import re
 from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar('_T')
+
+# All template placeholders, matched in a single pass over the template.
+_PLACEHOLDER_RE = re.compile(
+    r'\{\{(?:date|DATE|title|TITLE|date_long|DATE_LONG|date_iso|DATE_ISO)\}\}'
+)
+_PLACEHOLDER_MAX_LEN = len('{{DATE_LONG}}')
+_TEMPLATE_CHUNK_SIZE = 64 * 1024
+_GIT_STEP_EXIT_BASE = 100
+
+# Background git runs: serialized so concurrent writes never race on the
+# index lock, and tracked so shutdown can wait for pending pushes.
+_GIT_LOCK = asyncio.Lock()
+_GIT_TASKS: set[asyncio.Task] = set()
+
+# Daily note create and read-modify-write sequences, shared by every
+# action instance: file I/O runs on the executor, so without this two
+# requests can interleave across awaits and lose an update.
+_NOTE_LOCK = asyncio.Lock()
+
+
+async def drain_git_tasks() -> None:
+    """Wait for all background git operations to finish."""
+    if _GIT_TASKS:
+        await asyncio.gather(*_GIT_TASKS, return_exceptions=True)
+
 
 class DailyNoteAction:
     """Action to create or open the daily note."""
     
-    def __init__(self, repo_path: str, gitea_mode: str = "edit"):
+    def __init__(
+        self,
+        repo_path: str,
+        gitea_mode: str = "edit",
+        executor: Optional[Executor] = None,
+    ):
         """
         Initialize the daily note action.
         
         Args:
             repo_path: Path to the wintermute repository
             gitea_mode: "edit" or "view" for default Gitea link behavior
+            executor: Thread pool for blocking file I/O (loop default if None)
         """
         self.repo_path = Path(repo_path)
         self.template_path = self.repo_path / '0_admin' / '02_templates' / 'daily_note_2026.md'
         self.journal_path = self.repo_path / '1_life' / '13_journal'
         self.gitea_mode = gitea_mode
+        self.executor = executor
+        self._today_cache: tuple[date, str, Path] | None = None
+
+    def _get_today(self) -> tuple[date, str, Path]:
+        """Get today's (date, filename stem, note path), rebuilt once per day."""
+        today = date.today()
+        cached = self._today_cache
+        if cached is None or cached[0] != today:
+            date_str = today.strftime('%Y-%m-%d')
+            cached = (today, date_str, self.journal_path / f'{date_str}.md')
+            self._today_cache = cached
+        return cached
     
     def _get_today_filename(self) -> str:
         """Get today's date in YYYY-MM-DD format."""
-        return datetime.now().strftime('%Y-%m-%d')
+        return self._get_today()[1]
     
     def _get_daily_note_path(self) -> Path:
         """Get the path to today's daily note."""
-        date_str = self._get_today_filename()
-        return self.journal_path / f'{date_str}.md'
+        return self._get_today()[2]
     
-    def _replace_placeholders(self, content: str, date_str: str) -> str:
-        """
-        Replace placeholders in template content.
-        
-        Args:
-            content: Template content
-            date_str: Date string in YYYY-MM-DD format
-            
-        Returns:
-            Content with placeholders replaced
-        """
-        # Common placeholders
-        replacements = {
+    def _placeholder_values(self, today: date, date_str: str) -> Dict[str, str]:
+        """Map each template placeholder to its value for the given date."""
+        # Format: Monday, January 1, 2025
+        date_long = today.strftime('%A, %B %d, %Y')
+        return {
             '{{date}}': date_str,
             '{{DATE}}': date_str,
             '{{title}}': date_str,
             '{{TITLE}}': date_str,
-            # Format: Monday, January 1, 2025
-            '{{date_long}}': datetime.now().strftime('%A, %B %d, %Y'),
-            '{{DATE_LONG}}': datetime.now().strftime('%A, %B %d, %Y'),
+            '{{date_long}}': date_long,
+            '{{DATE_LONG}}': date_long,
             # Format: 2025-01-01
             '{{date_iso}}': date_str,
             '{{DATE_ISO}}': date_str,
         }
-        
-        result = content
-        for placeholder, value in replacements.items():
-            result = result.replace(placeholder, value)
-        
-        return result
+
+    def _render_template(self, src: TextIO, dst: TextIO, replacements: Dict[str, str]) -> None:
+        """
+        Stream the template from src to dst, replacing placeholders per chunk.
+
+        The last few characters of each chunk are held back so a placeholder
+        split across a chunk boundary is still matched whole.
+        """
+        pending = ''
+        while True:
+            chunk = src.read(_TEMPLATE_CHUNK_SIZE)
+            if not chunk:
+                break
+            pending += chunk
+            cut = len(pending) - _PLACEHOLDER_MAX_LEN + 1
+            if cut <= 0:
+                continue
+            pos = 0
+            for match in _PLACEHOLDER_RE.finditer(pending):
+                if match.start() >= cut:
+                    break
+                dst.write(pending[pos:match.start()])
+                dst.write(replacements[match.group(0)])
+                pos = match.end()
+            emit_to = max(pos, cut)
+            dst.write(pending[pos:emit_to])
+            pending = pending[emit_to:]
+        dst.write(_PLACEHOLDER_RE.sub(lambda m: replacements[m.group(0)], pending))
 
     def _build_working_copy_url(self, file_path: Path) -> str:
         """Build a Working Copy URL for the given repo-relative path."""
-        from config import Config
+        from config import build_wc_url
 
         rel_path = file_path.relative_to(self.repo_path).as_posix()
-        encoded_path = quote(rel_path)
-        encoded_repo = quote(Config.WORKING_COPY_REPO) if Config.WORKING_COPY_REPO else ''
-        encoded_key = quote(Config.WORKING_COPY_URL_KEY) if Config.WORKING_COPY_URL_KEY else ''
-        key_param = f'&key={encoded_key}' if encoded_key else ''
-        template = Config.WORKING_COPY_URL_TEMPLATE
-
-        try:
-            return template.format(
-                path=encoded_path,
-                repo=encoded_repo,
-                key_param=key_param
-            )
-        except Exception:
-            return template
+        return build_wc_url(quote(rel_path))
 
     def _build_obsidian_uri(self, file_path: Path) -> str:
         """Build an Obsidian URI for the given repo-relative path."""
@@ -109,7 +154,12 @@ class DailyNoteAction:
             return f'{base_url}/src/branch/{branch}/{encoded_path}'
         return f'{base_url}/_edit/{branch}/{encoded_path}'
     
-    async def _ensure_template_exists(self) -> bool:
+    async def _run_blocking(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run blocking file I/O on the action executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _ensure_template_exists(self) -> bool:
         """
         Verify that the template file exists.
         
@@ -128,8 +178,13 @@ class DailyNoteAction:
         Returns:
             Dictionary with success status and file path
         """
-        date_str = self._get_today_filename()
-        daily_note_path = self._get_daily_note_path()
+        return await self._run_blocking(self._create_daily_note_sync)
+
+    def _create_daily_note_sync(self) -> Dict[str, Any]:
+        """Blocking body of _create_daily_note; runs on the executor."""
+        # One clock read: file name and placeholders always agree on the day
+        today, date_str, daily_note_path = self._get_today()
+        rel_path = str(daily_note_path.relative_to(self.repo_path))
         
         # Check if note already exists
         if daily_note_path.exists():
@@ -137,12 +192,12 @@ class DailyNoteAction:
             return {
                 'success': True,
                 'message': f'Daily note already exists for {date_str}',
-                'file_path': str(daily_note_path.relative_to(self.repo_path)),
+                'file_path': rel_path,
                 'created': False
             }
         
         # Ensure template exists
-        if not await self._ensure_template_exists():
+        if not self._ensure_template_exists():
             return {
                 'success': False,
                 'error': 'Template not found',
@@ -152,10 +207,11 @@ class DailyNoteAction:
         # Ensure journal directory exists
         self.journal_path.mkdir(parents=True, exist_ok=True)
         
-        # Read template
+        replacements = self._placeholder_values(today, date_str)
+
+        # Open template
         try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
+            template = open(self.template_path, 'r', encoding='utf-8')
         except Exception as e:
             logger.error(f"Error reading template: {e}")
             return {
@@ -164,15 +220,21 @@ class DailyNoteAction:
                 'message': f'Failed to read template: {e}'
             }
         
-        # Replace placeholders
-        content = self._replace_placeholders(template_content, date_str)
-        
-        # Write daily note
+        # Stream template into the daily note, replacing placeholders
         try:
-            with open(daily_note_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with template, open(daily_note_path, 'w', encoding='utf-8') as f:
+                self._render_template(template, f, replacements)
             logger.info(f"Created daily note: {daily_note_path}")
+        except UnicodeDecodeError as e:
+            daily_note_path.unlink(missing_ok=True)
+            logger.error(f"Error reading template: {e}")
+            return {
+                'success': False,
+                'error': 'Template read error',
+                'message': f'Failed to read template: {e}'
+            }
         except Exception as e:
+            daily_note_path.unlink(missing_ok=True)
             logger.error(f"Error writing daily note: {e}")
             return {
                 'success': False,
@@ -183,17 +245,23 @@ class DailyNoteAction:
         return {
             'success': True,
             'message': f'Created daily note for {date_str}',
-            'file_path': str(daily_note_path.relative_to(self.repo_path)),
+            'file_path': rel_path,
             'created': True
         }
     
-    async def _git_add_commit_push(self, file_path: Path, commit_message: str) -> Dict[str, Any]:
+    async def _git_add_commit_push(
+        self,
+        file_path: Path,
+        commit_message: str,
+        rel_path: Path | None = None,
+    ) -> Dict[str, Any]:
         """
         Execute git add, commit, and push operations.
         
         Args:
             file_path: Path to the file to commit
             commit_message: Commit message
+            rel_path: file_path relative to the repo, if already computed
             
         Returns:
             Dictionary with success status
@@ -201,54 +269,114 @@ class DailyNoteAction:
         from config import Config
         
         repo_path = self.repo_path
+        if rel_path is None:
+            rel_path = file_path.relative_to(repo_path)
         
         # Git commands to run
         commands = [
             # Add the file
-            ['git', '-C', str(repo_path), 'add', str(file_path.relative_to(repo_path))],
+            ['git', '-C', str(repo_path), 'add', str(rel_path)],
             # Commit
             ['git', '-C', str(repo_path), 'commit', '-m', commit_message],
             # Push
             ['git', '-C', str(repo_path), 'push'],
         ]
         
-        for cmd in commands:
-            try:
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=str(repo_path)
-                )
-                
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode != 0:
-                    error_msg = stderr.decode('utf-8') if stderr else 'Unknown error'
-                    logger.error(f"Git command failed: {' '.join(cmd)} - {error_msg}")
-                    return {
-                        'success': False,
-                        'error': 'Git operation failed',
-                        'message': f'Git command failed: {error_msg}',
-                        'command': ' '.join(cmd)
-                    }
-                
-                logger.debug(f"Git command succeeded: {' '.join(cmd)}")
-                
-            except Exception as e:
-                logger.exception(f"Error executing git command: {' '.join(cmd)}")
-                return {
-                    'success': False,
-                    'error': 'Git execution error',
-                    'message': f'Failed to execute git command: {e}',
-                    'command': ' '.join(cmd)
-                }
+        # An earlier queued push may already have committed this change;
+        # with nothing staged the commit step is skipped rather than failed.
+        nothing_staged = ['git', '-C', str(repo_path), 'diff', '--cached', '--quiet']
+
+        # Run all steps in one shell; a failing step exits with
+        # _GIT_STEP_EXIT_BASE + its index so it can be reported precisely.
+        steps = []
+        for index, cmd in enumerate(commands):
+            step = f'{shlex.join(cmd)} || exit {_GIT_STEP_EXIT_BASE + index}'
+            if cmd[3] == 'commit':
+                step = f'{shlex.join(nothing_staged)} || {step}'
+            steps.append(step)
+        script = '\n'.join(steps)
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'sh', '-c', script,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=str(repo_path)
+            )
+            
+            stdout, stderr = await process.communicate()
+        except Exception as e:
+            logger.exception("Error executing git commands")
+            return {
+                'success': False,
+                'error': 'Git execution error',
+                'message': f'Failed to execute git command: {e}',
+                'command': ' '.join(commands[0])
+            }
+        
+        if process.returncode != 0:
+            step = process.returncode - _GIT_STEP_EXIT_BASE
+            failed = commands[step] if 0 <= step < len(commands) else ['sh', '-c', script]
+            error_msg = stderr.decode('utf-8') if stderr else 'Unknown error'
+            logger.error(f"Git command failed: {' '.join(failed)} - {error_msg}")
+            return {
+                'success': False,
+                'error': 'Git operation failed',
+                'message': f'Git command failed: {error_msg}',
+                'command': ' '.join(failed)
+            }
+        
+        logger.debug("Git commands succeeded")
         
         return {
             'success': True,
             'message': 'Git operations completed successfully'
         }
     
+    def _schedule_git_add_commit_push(
+        self,
+        file_path: Path,
+        commit_message: str,
+        rel_path: Path | None = None,
+    ) -> asyncio.Task:
+        """
+        Run git add, commit, and push in a background task.
+        
+        The caller can respond as soon as the file is written; the outcome
+        is logged by _log_git_result.
+        
+        Args:
+            file_path: Path to the file to commit
+            commit_message: Commit message
+            rel_path: file_path relative to the repo, if already computed
+            
+        Returns:
+            The scheduled task
+        """
+        async def run() -> Dict[str, Any]:
+            async with _GIT_LOCK:
+                return await self._git_add_commit_push(file_path, commit_message, rel_path)
+
+        task = asyncio.create_task(run())
+        _GIT_TASKS.add(task)
+        task.add_done_callback(self._log_git_result)
+        return task
+
+    def _log_git_result(self, task: asyncio.Task) -> None:
+        """Record the outcome of a background git task."""
+        _GIT_TASKS.discard(task)
+        if task.cancelled():
+            logger.warning("Background git operations cancelled")
+            return
+        if task.exception() is not None:
+            logger.error(f"Background git operations raised: {task.exception()}")
+            return
+        git_result = task.result()
+        if git_result.get('success'):
+            logger.info("Background git operations completed")
+        else:
+            logger.error(f"Background git operations failed: {git_result.get('message')}")
+    
     async def execute(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the daily note action.
@@ -260,25 +388,24 @@ class DailyNoteAction:
             Dictionary with success status and file information
         """
         # Create the daily note
-        result = await self._create_daily_note()
+        async with _NOTE_LOCK:
+            result = await self._create_daily_note()
         
         if not result.get('success'):
             return result
         
-        # If note was created, commit and push
+        # If note was created, commit and push in the background
         if result.get('created'):
             date_str = self._get_today_filename()
             daily_note_path = self._get_daily_note_path()
             commit_message = f'create daily note {date_str}'
             
-            git_result = await self._git_add_commit_push(daily_note_path, commit_message)
-            
-            if not git_result.get('success'):
-                # Note: We still return success for note creation, but include git error
-                result['git_error'] = git_result.get('message')
-                result['warning'] = 'Daily note created but git operations failed'
-            else:
-                result['git_success'] = True
+            self._schedule_git_add_commit_push(
+                daily_note_path,
+                commit_message,
+                Path(result['file_path']),
+            )
+            result['git_pending'] = True
 
         daily_note_path = self._get_daily_note_path()
         result['working_copy_url'] = self._build_working_copy_url(daily_note_path)
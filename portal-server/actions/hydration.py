@@ -2,54 +2,122 @@
 Hydration tracking action.
 """
 
+from concurrent.futures import Executor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 import logging
+import re
 
 import yaml
 
-from actions.daily_note import DailyNoteAction
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+from actions.daily_note import DailyNoteAction, _NOTE_LOCK
 
 logger = logging.getLogger(__name__)
 
+# Fast path: patch the oz_water line in place instead of a YAML round-trip.
+_FRONTMATTER_RE = re.compile(
+    rb'\A---[ \t]*\r?\n(.*?)^---[ \t]*\r?$',
+    re.DOTALL | re.MULTILINE,
+)
+_OZ_RE = re.compile(
+    rb'^(oz_water:[ \t]*)(0|-?[1-9][0-9]*)([ \t]*\r?)$',
+    re.MULTILINE,
+)
+
 
 class HydrationAction:
     """Action to increment oz_water in the daily note frontmatter."""
 
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, executor: Optional[Executor] = None):
         self.repo_path = Path(repo_path)
-        self.daily_action = DailyNoteAction(repo_path)
+        self.daily_action = DailyNoteAction(repo_path, executor=executor)
 
     def _split_frontmatter(self, content: str) -> Tuple[Dict[str, Any], str]:
         """Split YAML frontmatter from content, returning (frontmatter, body)."""
         if not content.startswith("---"):
             return {}, content
 
-        lines = content.splitlines(keepends=True)
-        if not lines or lines[0].strip() != "---":
+        first_newline = content.find("\n")
+        if first_newline < 0 or content[:first_newline].strip() != "---":
             return {}, content
 
-        for index in range(1, len(lines)):
-            if lines[index].strip() == "---":
-                frontmatter_text = "".join(lines[1:index])
-                body = "".join(lines[index + 1:])
-                data = yaml.safe_load(frontmatter_text) or {}
+        # Scan for the closing fence without splitting the note into lines;
+        # the search starts on the opening newline so empty frontmatter works.
+        fence = content.find("\n---", first_newline)
+        while fence >= 0:
+            line_end = content.find("\n", fence + 1)
+            if line_end < 0:
+                line_end = len(content)
+            if content[fence + 1:line_end].strip() == "---":
+                frontmatter_text = content[first_newline + 1:fence + 1]
+                body = content[line_end + 1:]
+                data = yaml.load(frontmatter_text, Loader=_Loader) or {}
                 if not isinstance(data, dict):
                     data = {}
                 return data, body
+            fence = content.find("\n---", fence + 1)
 
         return {}, content
 
     def _build_frontmatter(self, data: Dict[str, Any]) -> str:
         """Serialize YAML frontmatter."""
-        yaml_text = yaml.safe_dump(
+        yaml_text = yaml.dump(
             data,
+            Dumper=_Dumper,
             sort_keys=False,
             default_flow_style=False,
         )
         return f"---\n{yaml_text}---\n"
 
+    def _patch_oz_water(self, content: bytes, delta: int) -> Optional[Tuple[bytes, int, int]]:
+        """
+        Rewrite a plain integer oz_water line in the frontmatter.
+
+        Returns (new_content, current, next_value), or None when the
+        frontmatter needs the full YAML path (key missing, duplicated, or
+        not a plain integer).
+        """
+        frontmatter = _FRONTMATTER_RE.match(content)
+        if not frontmatter:
+            return None
+        start, end = frontmatter.span(1)
+        matches = list(_OZ_RE.finditer(content, start, end))
+        if len(matches) != 1:
+            return None
+        match = matches[0]
+        current = int(match.group(2))
+        next_value = current + delta
+        new_content = b"".join((
+            content[:match.start(2)],
+            str(next_value).encode("ascii"),
+            content[match.end(2):],
+        ))
+        return new_content, current, next_value
+
+    def _apply_delta(self, content: bytes, delta: int) -> Tuple[bytes, int, int]:
+        """Return (new_content, current, next_value) for the daily note."""
+        patched = self._patch_oz_water(content, delta)
+        if patched is not None:
+            return patched
+
+        frontmatter, body = self._split_frontmatter(content.decode("utf-8"))
+
+        try:
+            current = int(frontmatter.get("oz_water") or 0)
+        except (TypeError, ValueError):
+            current = 0
+
+        next_value = current + delta
+        frontmatter["oz_water"] = next_value
+        new_content = f"{self._build_frontmatter(frontmatter)}{body}"
+        return new_content.encode("utf-8"), current, next_value
+
     def _resolve_delta(self, payload: Dict[str, Any]) -> int:
         """Resolve the delta to add to oz_water."""
         delta = payload.get("delta")
@@ -71,7 +139,13 @@ class HydrationAction:
 
     async def execute(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Increment oz_water in today's daily note frontmatter."""
+        async with _NOTE_LOCK:
+            return await self._execute_locked(data)
+
+    async def _execute_locked(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Body of execute; the caller holds _NOTE_LOCK."""
         daily_note_path = self.daily_action._get_daily_note_path()
+        rel_path = daily_note_path.relative_to(self.repo_path)
         delta = self._resolve_delta(data)
         dry_run = self._is_dry_run(data)
 
@@ -88,7 +162,7 @@ class HydrationAction:
                 return create_result
 
         try:
-            content = daily_note_path.read_text(encoding="utf-8")
+            content = await self.daily_action._run_blocking(daily_note_path.read_bytes)
         except Exception as exc:
             logger.error("Failed to read daily note: %s", exc)
             return {
@@ -97,15 +171,15 @@ class HydrationAction:
                 "message": f"Failed to read daily note: {exc}",
             }
 
-        frontmatter, body = self._split_frontmatter(content)
-
         try:
-            current = int(frontmatter.get("oz_water") or 0)
-        except (TypeError, ValueError):
-            current = 0
-
-        next_value = current + delta
-        frontmatter["oz_water"] = next_value
+            new_content, current, next_value = self._apply_delta(content, delta)
+        except (yaml.YAMLError, UnicodeDecodeError) as exc:
+            logger.error("Failed to parse daily note frontmatter: %s", exc)
+            return {
+                "success": False,
+                "error": "Frontmatter parse error",
+                "message": f"Failed to parse daily note frontmatter: {exc}",
+            }
 
         if dry_run:
             return {
@@ -113,13 +187,12 @@ class HydrationAction:
                 "message": "Dry run: no changes applied",
                 "oz_water": current,
                 "oz_water_next": next_value,
-                "file_path": str(daily_note_path.relative_to(self.repo_path)),
+                "file_path": str(rel_path),
                 "gitea_url": self.daily_action._build_gitea_url(daily_note_path),
             }
 
         try:
-            new_content = f"{self._build_frontmatter(frontmatter)}{body}"
-            daily_note_path.write_text(new_content, encoding="utf-8")
+            await self.daily_action._run_blocking(daily_note_path.write_bytes, new_content)
         except Exception as exc:
             logger.error("Failed to write daily note: %s", exc)
             return {
@@ -131,26 +204,19 @@ class HydrationAction:
         commit_message = (
             f"add water {datetime.now().strftime('%Y-%m-%d')} +{delta}oz"
         )
-        git_result = await self.daily_action._git_add_commit_push(
+        self.daily_action._schedule_git_add_commit_push(
             daily_note_path,
             commit_message,
+            rel_path,
         )
-        if not git_result.get("success"):
-            result = {
-                "success": True,
-                "message": "Water added but git operations failed",
-                "oz_water": frontmatter["oz_water"],
-                "git_error": git_result.get("message"),
-            }
-        else:
-            result = {
-                "success": True,
-                "message": f"Added {delta}oz of water",
-                "oz_water": frontmatter["oz_water"],
-                "git_success": True,
-            }
-
-        result["file_path"] = str(daily_note_path.relative_to(self.repo_path))
+        result = {
+            "success": True,
+            "message": f"Added {delta}oz of water",
+            "oz_water": next_value,
+            "git_pending": True,
+        }
+
+        result["file_path"] = str(rel_path)
         result["working_copy_url"] = self.daily_action._build_working_copy_url(
             daily_note_path
         )
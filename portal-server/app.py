@@ -8,14 +8,20 @@ import hashlib
 import hmac
 import json
 import logging
+import re
+import string
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 
-from quart import Quart, request, jsonify, redirect
+import orjson
+from quart import Quart, Response, request, redirect
 
 from config import Config
 from actions import ActionRegistry
@@ -31,12 +37,203 @@ app = Quart(__name__)
 app.config.from_object(Config)
 
 # Initialize action registry
-action_registry = ActionRegistry(Config.WINTERMUTE_REPO_PATH)
-job_queue: asyncio.Queue["PortalJob"] = asyncio.Queue()
-job_status: Dict[str, Dict[str, Any]] = {}
-job_lock = asyncio.Lock()
-portal_last_job: Dict[str, Dict[str, Any]] = {}
+action_registry = ActionRegistry(
+    Config.WINTERMUTE_REPO_PATH,
+    max_workers=Config.PORTAL_WORKERS * 2,
+)
+job_queue: asyncio.Queue["PortalJob"] = asyncio.Queue(maxsize=Config.PORTAL_QUEUE_MAX)
+# Job statuses are split across small insertion-ordered shards so no single
+# dict grows (and resizes) with the whole store; each shard evicts its own
+# oldest entries. job_expiry and portal_last_job stay global and ordered so
+# expired entries are always a prefix.
+_JOB_STATUS_SHARDS = 8
+job_status_shards: "tuple[OrderedDict[str, Dict[str, Any]], ...]" = tuple(
+    OrderedDict() for _ in range(_JOB_STATUS_SHARDS)
+)
+job_expiry: "OrderedDict[str, float]" = OrderedDict()
+portal_last_job: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 worker_tasks: list[asyncio.Task] = []
+# With a single worker, jobs skip the queue and run as tasks serialized by
+# _inline_lock, saving the producer->consumer hop per webhook.
+_inline_tasks: set[asyncio.Task] = set()
+_inline_lock = asyncio.Lock()
+
+# Parsed portals.json keyed by mtime; reloaded only when the file changes.
+_portals_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+_portals_lock = threading.Lock()
+
+# Portal trigger page, minified and built once; $-placeholders are filled
+# per request ($$ is a literal dollar for the JS template strings).
+_PORTAL_HTML_SOURCE = """<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>Wintermute Portal</title>
+    <style>
+      body {
+        font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", monospace;
+        margin: 0;
+        padding: 2rem 1.5rem;
+        color: #e6e6e6;
+        background: #0b0f14;
+      }
+      .card {
+        max-width: 640px;
+        margin: 0 auto;
+        background: #101722;
+        border-radius: 18px;
+        padding: 24px;
+        border: 1px solid #1b2636;
+        box-shadow: 0 10px 30px rgba(0, 0, 0, 0.4);
+      }
+      .title {
+        font-size: 1.1rem;
+        margin-bottom: 0.5rem;
+      }
+      .subtitle {
+        color: #9aa7b5;
+        margin-bottom: 1.5rem;
+      }
+      .status {
+        background: #0b0f14;
+        border: 1px solid #223247;
+        padding: 12px;
+        border-radius: 12px;
+        font-size: 0.95rem;
+      }
+      .status strong {
+        color: #5dd39e;
+      }
+      .meta {
+        margin-top: 18px;
+        font-size: 0.85rem;
+        color: #7c8b99;
+      }
+    </style>
+  </head>
+  <body>
+    <div class="card">
+      <div class="title">portal: ${portal_id} → ${portal_label}</div>
+      <div class="subtitle">Triggering action in the background…</div>
+      <div class="status" id="status">Sending webhook…</div>
+      <div class="meta">You can close this page once accepted.</div>
+    </div>
+    <script>
+      const statusEl = document.getElementById('status');
+      const payload = ${payload_json};
+
+      const pollJob = (jobId) => {
+        const pollInterval = 1000;
+        const poll = () => {
+          fetch(`/wm/jobs/$${jobId}`)
+            .then(async (resp) => {
+              const body = await resp.json().catch(() => ({}));
+              if (!resp.ok) {
+                statusEl.textContent = `Error: $${body.message || resp.statusText}`;
+                return;
+              }
+              if (body.status === 'failed') {
+                statusEl.textContent = `Error: $${body.error || 'Job failed'}`;
+                return;
+              }
+              if (body.status === 'succeeded') {
+                const giteaUrl = body.result && body.result.gitea_url;
+                if (giteaUrl) {
+                  statusEl.textContent = 'Opening note in Gitea...';
+                  window.location.href = giteaUrl;
+                  return;
+                }
+                statusEl.textContent = 'Completed';
+                return;
+              }
+              statusEl.textContent = `Status: $${body.status}`;
+              setTimeout(poll, pollInterval);
+            })
+            .catch((err) => {
+              statusEl.textContent = `Error: $${err.message}`;
+            });
+        };
+        poll();
+      };
+
+      fetch('/wm/hooks/portal', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(payload)
+      })
+        .then(async (resp) => {
+          const body = await resp.json().catch(() => ({}));
+          if (!resp.ok) {
+            statusEl.textContent = `Error: $${body.message || resp.statusText}`;
+            return;
+          }
+          statusEl.innerHTML = `<strong>Accepted</strong> · Job $${body.job_id}`;
+          if (body.job_id) {
+            pollJob(body.job_id);
+          }
+        })
+        .catch((err) => {
+          statusEl.textContent = `Error: $${err.message}`;
+        });
+    </script>
+  </body>
+</html>
+"""
+
+_STYLE_RE = re.compile(r'(<style>)(.*?)(</style>)', re.DOTALL)
+_CSS_PUNCT_RE = re.compile(r'\s*([{};:,])\s*')
+
+
+def _minify_html(source: str) -> str:
+    """Drop indentation and blank lines; squeeze CSS around punctuation.
+
+    Line breaks are kept outside <style> so the JS never relies on
+    semicolon insertion across joined lines.
+    """
+    html = '\n'.join(line.strip() for line in source.splitlines() if line.strip())
+    return _STYLE_RE.sub(
+        lambda m: m[1] + _CSS_PUNCT_RE.sub(r'\1', m[2].replace('\n', '')) + m[3],
+        html,
+    )
+
+
+_PORTAL_HTML_TEMPLATE = string.Template(_minify_html(_PORTAL_HTML_SOURCE))
+_HTML_HEADERS = {'Content-Type': 'text/html; charset=utf-8'}
+
+# Fixed error bodies, serialized once at import.
+_ERR_INVALID_JSON = orjson.dumps({
+    'error': 'Invalid request',
+    'message': 'Request body must be JSON',
+})
+_ERR_MISSING_PORTAL_ID = orjson.dumps({
+    'error': 'Invalid request',
+    'message': 'Missing portal_id',
+})
+_ERR_MISSING_PORTAL_OR_ACTION = orjson.dumps({
+    'error': 'Invalid request',
+    'message': 'Missing portal_id or action',
+})
+_ERR_INVALID_PORTAL_ID = orjson.dumps({
+    'error': 'Invalid portal ID format',
+    'message': 'Portal ID must be 2-24 lowercase alphanumeric characters',
+})
+_ERR_INVALID_TIMESTAMP = orjson.dumps({
+    'error': 'Invalid signature timestamp',
+    'message': 'timestamp must be an integer',
+})
+_ERR_MISSING_ACTION = orjson.dumps({
+    'error': 'Invalid portal configuration',
+    'message': 'Portal configuration missing action',
+})
+_ERR_PORTALS_NOT_FOUND = orjson.dumps({
+    'error': 'Configuration error',
+    'message': 'Portals configuration file not found',
+})
+_ERR_PORTALS_INVALID = orjson.dumps({
+    'error': 'Configuration error',
+    'message': 'Invalid portals configuration file',
+})
 
 
 @dataclass
@@ -50,109 +247,223 @@ class PortalJob:
     created_at: float = field(default_factory=time.time)
 
 
+def orjsonify(payload: Any, status: int = 200) -> Response:
+    """Serialize a JSON response with orjson."""
+    return Response(orjson.dumps(payload), status=status, content_type='application/json')
+
+
+def _err(body: bytes, status: int) -> Response:
+    """Return a pre-serialized JSON error body."""
+    return Response(body, status=status, content_type='application/json')
+
+
 def utc_now_iso() -> str:
     """Return a UTC ISO-8601 timestamp."""
     return datetime.now(timezone.utc).isoformat()
 
 
-def build_signature(portal_id: str, timestamp: int, secret: str) -> str:
+def build_signature(portal_id: str, timestamp: int, secret: bytes) -> str:
     """Build the HMAC signature for a portal trigger."""
     message = f"{portal_id}:{timestamp}".encode("utf-8")
-    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def signed_payload_json(portal_id: str, timestamp: int) -> str:
+    """Signed trigger payload for the portal page.
+
+    Timestamps change once a second, so repeat scans within that second
+    reuse the HMAC and serialized JSON.
+    """
+    return orjson.dumps({
+        'portal_id': portal_id,
+        'timestamp': timestamp,
+        'signature': build_signature(portal_id, timestamp, Config.PORTAL_WEBHOOK_SECRET_BYTES),
+    }).decode('utf-8')
 
 
 def verify_signature(portal_id: str, timestamp: Optional[int], signature: Optional[str]) -> Tuple[bool, str]:
     """Verify the HMAC signature when the webhook secret is configured."""
-    secret = Config.PORTAL_WEBHOOK_SECRET
+    secret = Config.PORTAL_WEBHOOK_SECRET_BYTES
     if not secret:
         return True, ''
     if timestamp is None or not signature:
         return False, 'Missing signature or timestamp'
+    if not isinstance(signature, str):
+        return False, 'Invalid signature'
     now = int(time.time())
     if abs(now - timestamp) > Config.PORTAL_WEBHOOK_TTL_SECONDS:
         return False, 'Signature timestamp expired'
     expected = build_signature(portal_id, timestamp, secret)
-    if not hmac.compare_digest(expected, signature):
+    # Compare bytes: compare_digest rejects non-ASCII str outright.
+    if not hmac.compare_digest(expected.encode('ascii'), signature.encode('utf-8')):
         return False, 'Invalid signature'
     return True, ''
 
 
+def evict_expired_jobs(now: float) -> None:
+    """Drop finished job statuses past their TTL and stale dedup entries."""
+    while job_expiry:
+        job_id, expires_at = next(iter(job_expiry.items()))
+        if expires_at > now:
+            break
+        job_expiry.popitem(last=False)
+        _job_shard(job_id).pop(job_id, None)
+
+    while portal_last_job:
+        entry = next(iter(portal_last_job.values()))
+        if now - entry["enqueued_monotonic"] <= Config.PORTAL_DEDUP_WINDOW_SECONDS:
+            break
+        portal_last_job.popitem(last=False)
+
+
+def _job_shard(job_id: str) -> "OrderedDict[str, Dict[str, Any]]":
+    """Return the status shard that owns job_id."""
+    return job_status_shards[hash(job_id) & (_JOB_STATUS_SHARDS - 1)]
+
+
+def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Look up a job status, or None if unknown or evicted."""
+    return _job_shard(job_id).get(job_id)
+
+
+def store_job_status(job_id: str, status: Dict[str, Any]) -> None:
+    """Record a new job status, evicting the shard's oldest entry when full."""
+    shard = _job_shard(job_id)
+    shard[job_id] = status
+    shard_max = max(1, Config.PORTAL_JOB_STATUS_MAX // _JOB_STATUS_SHARDS)
+    while len(shard) > shard_max:
+        evicted_id, _ = shard.popitem(last=False)
+        job_expiry.pop(evicted_id, None)
+
+
+def update_job_status(job_id: str, fields: Dict[str, Any]) -> None:
+    """Update a job's status; finished jobs are scheduled for expiry."""
+    status = get_job_status(job_id)
+    if status is None:
+        # Evicted while running; nothing left to report to.
+        return
+    status.update(fields)
+    if fields.get("status") in ("succeeded", "failed"):
+        status["finished_at"] = fields.get("updated_at") or utc_now_iso()
+        job_expiry[job_id] = time.monotonic() + Config.PORTAL_JOB_STATUS_TTL_SECONDS
+
+
+def dispatch_job(job: "PortalJob") -> bool:
+    """Hand a job to the workers; returns False when at capacity."""
+    if Config.PORTAL_WORKERS == 1:
+        if len(_inline_tasks) >= Config.PORTAL_QUEUE_MAX:
+            return False
+        task = asyncio.create_task(run_job_inline(job))
+        _inline_tasks.add(task)
+        task.add_done_callback(_inline_tasks.discard)
+        return True
+    try:
+        job_queue.put_nowait(job)
+    except asyncio.QueueFull:
+        return False
+    return True
+
+
 async def enqueue_job(
     portal_id: str,
     action: str,
     payload: Dict[str, Any]
 ) -> Dict[str, Any]:
     """Enqueue a portal action and return job metadata."""
-    now = time.time()
-    async with job_lock:
-        last_entry = portal_last_job.get(portal_id)
-        if last_entry:
-            last_time = last_entry["enqueued_at"]
-            if now - last_time <= Config.PORTAL_DEDUP_WINDOW_SECONDS:
-                return {
-                    "job_id": last_entry["job_id"],
-                    "status": "deduped",
-                    "portal_id": portal_id,
-                    "action": action,
-                    "message": "Duplicate request ignored",
-                }
+    now = time.monotonic()
+    # No awaits between the dedup check and the inserts, so this block is
+    # atomic on the event loop without a lock.
+    evict_expired_jobs(now)
+    last_entry = portal_last_job.get(portal_id)
+    if last_entry:
+        last_time = last_entry["enqueued_monotonic"]
+        if now - last_time <= Config.PORTAL_DEDUP_WINDOW_SECONDS:
+            return {
+                "job_id": last_entry["job_id"],
+                "status": "deduped",
+                "portal_id": portal_id,
+                "action": action,
+                "message": "Duplicate request ignored",
+            }
 
-        job_id = uuid.uuid4().hex
-        job = PortalJob(
-            job_id=job_id,
-            portal_id=portal_id,
-            action=action,
-            payload=payload,
-        )
-        job_queue.put_nowait(job)
-        status = {
-            "job_id": job_id,
-            "status": "queued",
+    job_id = uuid.uuid4().hex
+    job = PortalJob(
+        job_id=job_id,
+        portal_id=portal_id,
+        action=action,
+        payload=payload,
+    )
+    if not dispatch_job(job):
+        logger.warning(f"Job queue full, rejecting portal {portal_id}")
+        return {
+            "job_id": None,
+            "status": "rejected",
             "portal_id": portal_id,
             "action": action,
-            "created_at": utc_now_iso(),
-            "updated_at": utc_now_iso(),
-        }
-        job_status[job_id] = status
-        portal_last_job[portal_id] = {
-            "job_id": job_id,
-            "enqueued_at": now,
+            "message": "Job queue is full, try again later",
         }
+    created_at = utc_now_iso()
+    status = {
+        "job_id": job_id,
+        "status": "queued",
+        "portal_id": portal_id,
+        "action": action,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+    store_job_status(job_id, status)
+    portal_last_job[portal_id] = {
+        "job_id": job_id,
+        "enqueued_monotonic": now,
+    }
+    portal_last_job.move_to_end(portal_id)
 
     return status
 
 
+async def run_job(job: "PortalJob") -> None:
+    """Execute a single job and record its progress."""
+    update_job_status(job.job_id, {
+        "status": "in_progress",
+        "updated_at": utc_now_iso(),
+    })
+
+    try:
+        result = await action_registry.execute(job.action, job.payload)
+        status = "succeeded" if result.get("success") else "failed"
+        update_job_status(job.job_id, {
+            "status": status,
+            "result": result,
+            "updated_at": utc_now_iso(),
+        })
+        logger.info(
+            "Job %s completed with status %s for portal %s",
+            job.job_id,
+            status,
+            job.portal_id,
+        )
+    except Exception as e:
+        logger.exception("Job %s failed: %s", job.job_id, e)
+        update_job_status(job.job_id, {
+            "status": "failed",
+            "error": str(e),
+            "updated_at": utc_now_iso(),
+        })
+
+
+async def run_job_inline(job: "PortalJob") -> None:
+    """Run a job directly, one at a time, when PORTAL_WORKERS is 1."""
+    async with _inline_lock:
+        await run_job(job)
+
+
 async def portal_worker(worker_id: int) -> None:
     """Background worker to process portal jobs."""
     while True:
         job = await job_queue.get()
-        async with job_lock:
-            job_status[job.job_id]["status"] = "in_progress"
-            job_status[job.job_id]["updated_at"] = utc_now_iso()
-
         try:
-            result = await action_registry.execute(job.action, job.payload)
-            status = "succeeded" if result.get("success") else "failed"
-            async with job_lock:
-                job_status[job.job_id].update({
-                    "status": status,
-                    "result": result,
-                    "updated_at": utc_now_iso(),
-                })
-            logger.info(
-                "Job %s completed with status %s for portal %s",
-                job.job_id,
-                status,
-                job.portal_id,
-            )
-        except Exception as e:
-            logger.exception("Job %s failed: %s", job.job_id, e)
-            async with job_lock:
-                job_status[job.job_id].update({
-                    "status": "failed",
-                    "error": str(e),
-                    "updated_at": utc_now_iso(),
-                })
+            await run_job(job)
         finally:
             job_queue.task_done()
 
@@ -160,6 +471,8 @@ async def portal_worker(worker_id: int) -> None:
 @app.before_serving
 async def start_workers() -> None:
     """Start background worker tasks."""
+    if Config.PORTAL_WORKERS == 1:
+        return
     for index in range(Config.PORTAL_WORKERS):
         worker_tasks.append(asyncio.create_task(portal_worker(index)))
 
@@ -167,9 +480,12 @@ async def start_workers() -> None:
 @app.after_serving
 async def stop_workers() -> None:
     """Stop background worker tasks."""
-    for task in worker_tasks:
+    tasks = [*worker_tasks, *_inline_tasks]
+    for task in tasks:
         task.cancel()
-    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    worker_tasks.clear()
+    await action_registry.drain()
 
 
 def validate_portal_id(portal_id: str) -> bool:
@@ -182,18 +498,44 @@ def validate_portal_id(portal_id: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not portal_id:
-        return False
-    if len(portal_id) < 2 or len(portal_id) > 24:
+    # Length is checked before the cache so oversized input never enters it.
+    if not isinstance(portal_id, str) or not 2 <= len(portal_id) <= 24:
         return False
-    valid_chars = set('abcdefghijklmnopqrstuvwxyz0123456789')
-    return all(c in valid_chars for c in portal_id.lower())
+    return _portal_id_chars_ok(portal_id)
+
+
+@lru_cache(maxsize=1024)
+def _portal_id_chars_ok(portal_id: str) -> bool:
+    """Character check for validate_portal_id, memoized per ID."""
+    # Single-pass C scans: ASCII letters/digits only, with any letters
+    # lowercase (islower() is False for all-digit IDs, hence isdigit()).
+    return (
+        portal_id.isascii()
+        and portal_id.isalnum()
+        and (portal_id.islower() or portal_id.isdigit())
+    )
 
 
-def load_portals_config() -> Dict[str, Any]:
+def _load_portals_sync(portals_path: Path, mtime_ns: int) -> Dict[str, Any]:
+    """Read and cache portals.json; runs in a worker thread."""
+    global _portals_cache
+    with _portals_lock:
+        cached = _portals_cache
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        with open(portals_path, 'rb') as f:
+            portals = orjson.loads(f.read())
+        _portals_cache = (mtime_ns, portals)
+    return portals
+
+
+async def load_portals_config() -> Dict[str, Any]:
     """
     Load portals.json from the wintermute repo.
     
+    Cache hits return without leaving the event loop; a changed or cold
+    file is read in a worker thread.
+    
     Returns:
         Dictionary of portal configurations
         
@@ -203,12 +545,16 @@ def load_portals_config() -> Dict[str, Any]:
     """
     portals_path = Path(Config.WINTERMUTE_REPO_PATH) / '0_admin' / '00_index' / 'portals.json'
     
-    if not portals_path.exists():
+    try:
+        mtime_ns = portals_path.stat().st_mtime_ns
+    except FileNotFoundError:
         logger.error(f"Portals config not found at {portals_path}")
         raise FileNotFoundError(f"Portals config not found: {portals_path}")
     
-    with open(portals_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    cached = _portals_cache
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    return await asyncio.to_thread(_load_portals_sync, portals_path, mtime_ns)
 
 
 @app.route('/wm/p/<portal_id>', methods=['GET'])
@@ -222,183 +568,64 @@ async def portal_handler(portal_id: str):
         # Validate portal ID format
         if not validate_portal_id(portal_id):
             logger.warning(f"Invalid portal ID format: {portal_id}")
-            return jsonify({
-                'error': 'Invalid portal ID format',
-                'message': 'Portal ID must be 2-24 lowercase alphanumeric characters'
-            }), 400
+            return _err(_ERR_INVALID_PORTAL_ID, 400)
         
         # Load portals config
-        portals = load_portals_config()
+        portals = await load_portals_config()
         
         if portal_id not in portals:
             logger.warning(f"Portal ID not found: {portal_id}")
-            return jsonify({
+            return orjsonify({
                 'error': 'Portal not found',
                 'message': f'No configuration found for portal ID: {portal_id}'
-            }), 404
+            }, 404)
         
         portal_config = portals[portal_id]
         action = portal_config.get('action')
         
         if not action:
             logger.error(f"Portal {portal_id} missing action")
-            return jsonify({
-                'error': 'Invalid portal configuration',
-                'message': 'Portal configuration missing action'
-            }), 500
+            return _err(_ERR_MISSING_ACTION, 500)
         
         logger.info(f"Portal {portal_id} requested, action: {action}")
         
         portal_label = portal_config.get('label', action)
-        signature_payload = {}
-        if Config.PORTAL_WEBHOOK_SECRET:
-            timestamp = int(time.time())
-            signature_payload = {
-                'timestamp': timestamp,
-                'signature': build_signature(portal_id, timestamp, Config.PORTAL_WEBHOOK_SECRET),
-            }
-
-        payload_json = json.dumps({
-            'portal_id': portal_id,
-            **signature_payload,
-        })
-
-        html = f"""<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>Wintermute Portal</title>
-    <style>
-      body {{
-        font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", monospace;
-        margin: 0;
-        padding: 2rem 1.5rem;
-        color: #e6e6e6;
-        background: #0b0f14;
-      }}
-      .card {{
-        max-width: 640px;
-        margin: 0 auto;
-        background: #101722;
-        border-radius: 18px;
-        padding: 24px;
-        border: 1px solid #1b2636;
-        box-shadow: 0 10px 30px rgba(0, 0, 0, 0.4);
-      }}
-      .title {{
-        font-size: 1.1rem;
-        margin-bottom: 0.5rem;
-      }}
-      .subtitle {{
-        color: #9aa7b5;
-        margin-bottom: 1.5rem;
-      }}
-      .status {{
-        background: #0b0f14;
-        border: 1px solid #223247;
-        padding: 12px;
-        border-radius: 12px;
-        font-size: 0.95rem;
-      }}
-      .status strong {{
-        color: #5dd39e;
-      }}
-      .meta {{
-        margin-top: 18px;
-        font-size: 0.85rem;
-        color: #7c8b99;
-      }}
-    </style>
-  </head>
-  <body>
-    <div class="card">
-      <div class="title">portal: {portal_id} → {portal_label}</div>
-      <div class="subtitle">Triggering action in the background…</div>
-      <div class="status" id="status">Sending webhook…</div>
-      <div class="meta">You can close this page once accepted.</div>
-    </div>
-    <script>
-      const statusEl = document.getElementById('status');
-      const payload = {payload_json};
-
-      const pollJob = (jobId) => {{
-        const pollInterval = 1000;
-        const poll = () => {{
-          fetch(`/wm/jobs/${{jobId}}`)
-            .then(async (resp) => {{
-              const body = await resp.json().catch(() => ({{}}));
-              if (!resp.ok) {{
-                statusEl.textContent = `Error: ${{body.message || resp.statusText}}`;
-                return;
-              }}
-              if (body.status === 'failed') {{
-                statusEl.textContent = `Error: ${{body.error || 'Job failed'}}`;
-                return;
-              }}
-              if (body.status === 'succeeded') {{
-                const giteaUrl = body.result && body.result.gitea_url;
-                if (giteaUrl) {{
-                  statusEl.textContent = 'Opening note in Gitea...';
-                  window.location.href = giteaUrl;
-                  return;
-                }}
-                statusEl.textContent = 'Completed';
-                return;
-              }}
-              statusEl.textContent = `Status: ${{body.status}}`;
-              setTimeout(poll, pollInterval);
-            }})
-            .catch((err) => {{
-              statusEl.textContent = `Error: ${{err.message}}`;
-            }});
-        }};
-        poll();
-      }};
+        if Config.PORTAL_WEBHOOK_SECRET_BYTES:
+            payload_json = signed_payload_json(portal_id, int(time.time()))
+        else:
+            payload_json = orjson.dumps({'portal_id': portal_id}).decode('utf-8')
 
-      fetch('/wm/hooks/portal', {{
-        method: 'POST',
-        headers: {{'Content-Type': 'application/json'}},
-        body: JSON.stringify(payload)
-      }})
-        .then(async (resp) => {{
-          const body = await resp.json().catch(() => ({{}}));
-          if (!resp.ok) {{
-            statusEl.textContent = `Error: ${{body.message || resp.statusText}}`;
-            return;
-          }}
-          statusEl.innerHTML = `<strong>Accepted</strong> · Job ${{body.job_id}}`;
-          if (body.job_id) {{
-            pollJob(body.job_id);
-          }}
-        }})
-        .catch((err) => {{
-          statusEl.textContent = `Error: ${{err.message}}`;
-        }});
-    </script>
-  </body>
-</html>
-"""
-        return html, 200, {'Content-Type': 'text/html; charset=utf-8'}
+        html = _PORTAL_HTML_TEMPLATE.substitute(
+            portal_id=portal_id,
+            portal_label=portal_label,
+            payload_json=payload_json,
+        )
+        return html, 200, _HTML_HEADERS
         
     except FileNotFoundError as e:
         logger.error(f"Portals config not found: {e}")
-        return jsonify({
-            'error': 'Configuration error',
-            'message': 'Portals configuration file not found'
-        }), 500
+        return _err(_ERR_PORTALS_NOT_FOUND, 500)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in portals config: {e}")
-        return jsonify({
-            'error': 'Configuration error',
-            'message': 'Invalid portals configuration file'
-        }), 500
+        return _err(_ERR_PORTALS_INVALID, 500)
     except Exception as e:
         logger.exception(f"Unexpected error in portal_handler: {e}")
-        return jsonify({
+        return orjsonify({
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
+
+
+async def read_json_object() -> Optional[Dict[str, Any]]:
+    """Parse the request body as a JSON object, or None if it isn't one."""
+    raw = await request.get_data(cache=False)
+    if not raw:
+        return None
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) and data else None
 
 
 @app.route('/wm/hooks/portal', methods=['POST'])
@@ -414,58 +641,43 @@ async def portal_webhook():
     }
     """
     try:
-        data = await request.get_json()
+        data = await read_json_object()
 
         if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
+            return _err(_ERR_INVALID_JSON, 400)
 
         portal_id = data.get('portal_id')
         if not portal_id:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Missing portal_id'
-            }), 400
+            return _err(_ERR_MISSING_PORTAL_ID, 400)
 
         if not validate_portal_id(portal_id):
-            return jsonify({
-                'error': 'Invalid portal ID format',
-                'message': 'Portal ID must be 2-24 lowercase alphanumeric characters'
-            }), 400
+            return _err(_ERR_INVALID_PORTAL_ID, 400)
 
         timestamp = data.get('timestamp')
         signature = data.get('signature')
         try:
             timestamp_int = int(timestamp) if timestamp is not None else None
         except (TypeError, ValueError):
-            return jsonify({
-                'error': 'Invalid signature timestamp',
-                'message': 'timestamp must be an integer'
-            }), 400
+            return _err(_ERR_INVALID_TIMESTAMP, 400)
 
         is_valid, error_message = verify_signature(portal_id, timestamp_int, signature)
         if not is_valid:
-            return jsonify({
+            return orjsonify({
                 'error': 'Unauthorized',
                 'message': error_message
-            }), 401
+            }, 401)
 
-        portals = load_portals_config()
+        portals = await load_portals_config()
         portal_config = portals.get(portal_id)
         if not portal_config:
-            return jsonify({
+            return orjsonify({
                 'error': 'Portal not found',
                 'message': f'No configuration found for portal ID: {portal_id}'
-            }), 404
+            }, 404)
 
         action = portal_config.get('action')
         if not action:
-            return jsonify({
-                'error': 'Invalid portal configuration',
-                'message': 'Portal configuration missing action'
-            }), 500
+            return _err(_ERR_MISSING_ACTION, 500)
 
         payload = {
             'portal_id': portal_id,
@@ -473,40 +685,35 @@ async def portal_webhook():
             'config': portal_config,
         }
         job_info = await enqueue_job(portal_id, action, payload)
-        job_info['accepted_at'] = utc_now_iso()
-        return jsonify(job_info), 202
+        if job_info['status'] == 'rejected':
+            return orjsonify(job_info, 503)
+        job_info['accepted_at'] = job_info.get('created_at') or utc_now_iso()
+        return orjsonify(job_info, 202)
 
     except FileNotFoundError as e:
         logger.error(f"Portals config not found: {e}")
-        return jsonify({
-            'error': 'Configuration error',
-            'message': 'Portals configuration file not found'
-        }), 500
+        return _err(_ERR_PORTALS_NOT_FOUND, 500)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in portals config: {e}")
-        return jsonify({
-            'error': 'Configuration error',
-            'message': 'Invalid portals configuration file'
-        }), 500
+        return _err(_ERR_PORTALS_INVALID, 500)
     except Exception as e:
         logger.exception(f"Unexpected error in portal_webhook: {e}")
-        return jsonify({
+        return orjsonify({
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/wm/jobs/<job_id>', methods=['GET'])
 async def job_status_handler(job_id: str):
     """Fetch job status by job ID."""
-    async with job_lock:
-        status = job_status.get(job_id)
+    status = get_job_status(job_id)
     if not status:
-        return jsonify({
+        return orjsonify({
             'error': 'Job not found',
             'message': f'No job found with id {job_id}'
-        }), 404
-    return jsonify(status), 200
+        }, 404)
+    return orjsonify(status, 200)
 
 
 @app.route('/wm/act', methods=['POST'])
@@ -522,22 +729,16 @@ async def action_handler():
     }
     """
     try:
-        data = await request.get_json()
+        data = await read_json_object()
         
         if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
+            return _err(_ERR_INVALID_JSON, 400)
         
         portal_id = data.get('portal_id')
         action = data.get('action')
         
         if not portal_id or not action:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Missing portal_id or action'
-            }), 400
+            return _err(_ERR_MISSING_PORTAL_OR_ACTION, 400)
         
         logger.info(f"Executing action: {action} for portal: {portal_id}")
         
@@ -552,32 +753,32 @@ async def action_handler():
             )
             if gitea_url and wants_redirect:
                 return redirect(gitea_url)
-            return jsonify(result), 200
+            return orjsonify(result, 200)
         else:
-            return jsonify(result), 500
+            return orjsonify(result, 500)
             
     except Exception as e:
         logger.exception(f"Unexpected error in action_handler: {e}")
-        return jsonify({
+        return orjsonify({
             'error': 'Internal server error',
             'message': str(e),
             'success': False
-        }), 500
+        }, 500)
 
 
 @app.route('/health', methods=['GET'])
 async def health_check():
     """Health check endpoint."""
-    return jsonify({
+    return orjsonify({
         'status': 'healthy',
         'service': 'wintermute-portal-router'
-    }), 200
+    }, 200)
 
 
 @app.route('/wm/endpoints', methods=['GET'])
 async def list_endpoints():
     """List available endpoints and basic usage."""
-    return jsonify({
+    return orjsonify({
         'endpoints': [
             {
                 'method': 'GET',
@@ -610,10 +811,16 @@ async def list_endpoints():
                 'description': 'Health check.'
             }
         ]
-    }), 200
+    }, 200)
 
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     app.run(
         host=Config.HOST,
         port=Config.PORT,
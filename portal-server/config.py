@@ -4,50 +4,88 @@ Configuration for the Wintermute Portal Router.
 
 import os
 from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
 
 from dotenv import load_dotenv
 
 
-_ENV_PATH = Path(__file__).resolve().parents[1] / '.env'
+# abspath rather than resolve(): no symlink walk, still safe if __file__
+# is relative to a since-changed cwd.
+_HERE = Path(os.path.abspath(__file__)).parent
+_ENV_PATH = _HERE.parent / '.env'
 load_dotenv(_ENV_PATH)
 
+# One snapshot of the environment (after .env is applied); Config reads
+# from this plain dict and never goes back to os.environ.
+_ENV = dict(os.environ)
+
 
 class Config:
     """Application configuration."""
     
     # Server settings
-    HOST = os.getenv('WM_PORTAL_HOST', '0.0.0.0')
-    PORT = int(os.getenv('WM_PORTAL_PORT', '8090'))
-    DEBUG = os.getenv('WM_PORTAL_DEBUG', 'False').lower() == 'true'
+    HOST = _ENV.get('WM_PORTAL_HOST', '0.0.0.0')
+    PORT = int(_ENV.get('WM_PORTAL_PORT', '8090'))
+    DEBUG = _ENV.get('WM_PORTAL_DEBUG', 'False').lower() == 'true'
     
     # Wintermute repo path on yuckbox
-    WINTERMUTE_REPO_PATH = os.getenv(
+    WINTERMUTE_REPO_PATH = _ENV.get(
         'WINTERMUTE_REPO_PATH',
         '/home/ian/WINTERMUTE'
     )
     
     # Git configuration
-    GIT_USER_NAME = os.getenv('GIT_USER_NAME', 'Wintermute Portal')
-    GIT_USER_EMAIL = os.getenv('GIT_USER_EMAIL', 'portal@wintermute.local')
+    GIT_USER_NAME = _ENV.get('GIT_USER_NAME', 'Wintermute Portal')
+    GIT_USER_EMAIL = _ENV.get('GIT_USER_EMAIL', 'portal@wintermute.local')
 
-    # Working Copy (iOS) URL template for opening files.
+    # Working Copy (iOS) deep links for opening files; see build_wc_url().
     # Repo is static for the primary vault: http://yuckbox:3000/ian/wintermute
     WORKING_COPY_REPO = 'wintermute'
-    WORKING_COPY_URL_KEY = os.getenv('WC_URL_KEY', '')
-    WORKING_COPY_URL_TEMPLATE = (
-        'working-copy://x-callback-url/read?repo={repo}&path={path}{key_param}'
-        '&type=auto&clipboard=no'
-    )
+    WORKING_COPY_URL_KEY = _ENV.get('WC_URL_KEY', '')
 
     # Gitea web URL for opening files in the browser.
-    GITEA_BASE_URL = os.getenv('GITEA_BASE_URL', 'http://yuckbox:3000/ian/wintermute')
-    GITEA_BRANCH = os.getenv('GITEA_BRANCH', 'main')
+    GITEA_BASE_URL = _ENV.get('GITEA_BASE_URL', 'http://yuckbox:3000/ian/wintermute')
+    GITEA_BRANCH = _ENV.get('GITEA_BRANCH', 'main')
     
     # Logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVEL = _ENV.get('LOG_LEVEL', 'INFO')
 
     # Webhook settings
-    PORTAL_WEBHOOK_SECRET = os.getenv('PORTAL_WEBHOOK_SECRET', '')
-    PORTAL_WEBHOOK_TTL_SECONDS = int(os.getenv('PORTAL_WEBHOOK_TTL_SECONDS', '300'))
-    PORTAL_WORKERS = int(os.getenv('PORTAL_WORKERS', '1'))
-    PORTAL_DEDUP_WINDOW_SECONDS = int(os.getenv('PORTAL_DEDUP_WINDOW_SECONDS', '60'))
+    PORTAL_WEBHOOK_SECRET = _ENV.get('PORTAL_WEBHOOK_SECRET', '')
+    PORTAL_WEBHOOK_SECRET_BYTES = PORTAL_WEBHOOK_SECRET.encode('utf-8')
+    PORTAL_WEBHOOK_TTL_SECONDS = int(_ENV.get('PORTAL_WEBHOOK_TTL_SECONDS', '300'))
+    PORTAL_WORKERS = int(_ENV.get('PORTAL_WORKERS', '1'))
+    # Queued jobs beyond this are rejected with 503 instead of piling up.
+    PORTAL_QUEUE_MAX = int(_ENV.get('PORTAL_QUEUE_MAX', '1024'))
+    PORTAL_DEDUP_WINDOW_SECONDS = int(_ENV.get('PORTAL_DEDUP_WINDOW_SECONDS', '60'))
+
+    # Job status retention: finished jobs expire after the TTL, and the
+    # store never holds more than PORTAL_JOB_STATUS_MAX entries.
+    PORTAL_JOB_STATUS_TTL_SECONDS = int(_ENV.get('PORTAL_JOB_STATUS_TTL_SECONDS', '3600'))
+    PORTAL_JOB_STATUS_MAX = int(_ENV.get('PORTAL_JOB_STATUS_MAX', '4096'))
+
+
+def _wc_url_parts(repo: str, key: str) -> tuple:
+    """Return the (prefix, suffix) around the path in a Working Copy URL."""
+    key_param = f'&key={quote(key)}' if key else ''
+    return (
+        f'working-copy://x-callback-url/read?repo={quote(repo)}&path=',
+        f'{key_param}&type=auto&clipboard=no',
+    )
+
+
+# Repo and key are fixed for the process, so the URL around the path is
+# built once here instead of formatting a template on every request.
+_WC_PREFIX, _WC_SUFFIX = _wc_url_parts(Config.WORKING_COPY_REPO, Config.WORKING_COPY_URL_KEY)
+
+
+def build_wc_url(path: str, repo: Optional[str] = None, key: Optional[str] = None) -> str:
+    """Build a Working Copy URL for an already URL-quoted repo-relative path."""
+    if repo is None and key is None:
+        return f'{_WC_PREFIX}{path}{_WC_SUFFIX}'
+    prefix, suffix = _wc_url_parts(
+        Config.WORKING_COPY_REPO if repo is None else repo,
+        Config.WORKING_COPY_URL_KEY if key is None else key,
+    )
+    return f'{prefix}{path}{suffix}'
@@ -3,14 +3,70 @@
 Generate QR code for a portal URL.
 """
 
-import qrcode
+from multiprocessing import Pool
 from pathlib import Path
+import shutil
+import subprocess
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import segno
+from PIL import Image
 
 # Portal URL for daily note
 # Using direct Tailscale IP (temporary until DNS is configured)
 PORTAL_URL = "https://yuckbox.spillyourguts.online/wm/p/dle"
 OUTPUT_FILE = Path(__file__).parent / "qr_daily_note.png"
 
+BOX_SIZE = 10
+BORDER = 4
+
+
+def qr_matrix(url: str, border: int = BORDER) -> np.ndarray:
+    """
+    Encode a URL as a boolean module matrix (True = dark), quiet zone included.
+    
+    Args:
+        url: The URL to encode in the QR code
+        border: Quiet-zone width in modules
+        
+    Returns:
+        Square bool array, one element per module
+    """
+    # Smallest version that fits, low error correction (as qrcode fit=True)
+    qr = segno.make_qr(url, error="l", boost_error=False)
+    return np.pad(np.array(qr.matrix, dtype=bool), border, constant_values=False)
+
+
+def render_qr(url: str, box_size: int = BOX_SIZE, border: int = BORDER) -> Image.Image:
+    """
+    Encode a URL and render it as a 1-bit black-on-white image.
+    
+    Args:
+        url: The URL to encode in the QR code
+        box_size: Pixels per module
+        border: Quiet-zone width in modules
+        
+    Returns:
+        The rendered QR code image
+    """
+    dark = qr_matrix(url, border)
+    # Scale every module to a box_size x box_size block in one pass
+    pixels = np.kron(dark, np.ones((box_size, box_size), dtype=bool))
+    # Bool arrays map straight to mode "1" (True = white)
+    return Image.fromarray(~pixels)
+
+
+def _postoptimize(path: Path):
+    """Losslessly recompress a PNG with oxipng, if it is installed."""
+    oxipng = shutil.which("oxipng")
+    if oxipng:
+        subprocess.run(
+            [oxipng, "-o", "4", "--strip", "safe", "--quiet", str(path)],
+            check=False,
+        )
+
+
 def generate_qr_code(url: str, output_path: Path):
     """
     Generate a QR code for the given URL.
@@ -19,26 +75,25 @@ def generate_qr_code(url: str, output_path: Path):
         url: The URL to encode in the QR code
         output_path: Path to save the QR code image
     """
-    # Create QR code instance
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    
-    # Add data
-    qr.add_data(url)
-    qr.make(fit=True)
-    
-    # Create image
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Save
-    img.save(output_path)
+    img = render_qr(url)
+    img.save(output_path, optimize=True)
+    _postoptimize(output_path)
     print(f"✓ QR code generated: {output_path}")
     print(f"  URL: {url}")
 
+
+def generate_qr_codes(jobs: Iterable[Tuple[str, Path]], processes: Optional[int] = None):
+    """
+    Generate many QR codes in parallel, one process per core.
+    
+    Args:
+        jobs: (url, output_path) pairs
+        processes: Worker count (defaults to the CPU count)
+    """
+    with Pool(processes) as pool:
+        pool.starmap(generate_qr_code, jobs)
+
+
 if __name__ == "__main__":
     generate_qr_code(PORTAL_URL, OUTPUT_FILE)
 
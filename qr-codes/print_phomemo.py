@@ -1,43 +1,432 @@
 #!/usr/bin/env python3
 
-import argparse
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 import sys
+import tempfile
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-import phomemo_m02s._image_helper
-from phomemo_m02s.printer import Printer
+# phomemo_m02s, NumPy, PIL and generate_qr are imported where they are
+# used, so --help and the convert-only path skip what they don't need.
+if TYPE_CHECKING:
+    import numpy as np
 
 
-def main() -> int:
-    default_image = Path(__file__).resolve().parent / "qr_daily_note.png"
+# Where phomemo_m02s.printer.Printer (the qr-codes/phomemo submodule)
+# keeps its serial/BT link. Must match the library; checked at startup.
+_TRANSPORT_ATTR = "_port"
+DEFAULT_CHUNK_SIZE = 4096
+DEFAULT_IMAGE = Path(__file__).parent / "qr_daily_note.png"
+# ESC/POS "GS v 0" raster bands carry at most this many rows each.
+_RASTER_BAND_ROWS = 255
+# .phm: b"PHM1", width and height (uint32 LE), 4 reserved bytes, then the
+# packed rows exactly as print_raw_bitmap sends them (1 = black).
+PHM_SUFFIX = ".phm"
+PHM_MAGIC = b"PHM1"
+_PHM_HEADER_SIZE = 16
+
+
+def _rasterize(image_path: Path, width: int) -> bytes:
+    """Scale an image to width dots and pack it as 1-bit rows (1 = black)."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        img = img.convert("L")
+        height = max(1, round(img.height * width / img.width))
+        # Nearest keeps QR module edges sharp; no dithering needed
+        img = img.resize((width, height), Image.NEAREST)
+        # Threshold and pack 8 dots per byte, MSB first, in one C pass
+        return np.packbits(np.asarray(img) < 128, axis=1).tobytes()
+
+
+def matrix_to_bitmap(matrix: "np.ndarray", width: int) -> bytes:
+    """
+    Pack a QR module matrix (True = dark) as 1-bit printer rows.
+
+    Modules are scaled by the largest whole factor that fits width and the
+    code is centered, so no PNG is written or decoded on the way.
+    """
+    import numpy as np
+
+    scale = max(1, width // matrix.shape[1])
+    dots = np.kron(matrix, np.ones((scale, scale), dtype=bool))
+    pad = max(0, width - dots.shape[1])
+    dots = np.pad(dots, ((0, 0), (pad // 2, pad - pad // 2)), constant_values=False)
+    return np.packbits(dots[:, :width], axis=1).tobytes()
+
+
+def load_bitmap(image_path: Path, width: int) -> bytes:
+    """
+    Return the packed printer bitmap for image_path at width dots.
+
+    The bitmap is cached in a .<width>.bin sidecar next to the image and
+    rebuilt only when the image is newer than the sidecar.
+    """
+    width_bytes = (width + 7) // 8
+    sidecar = image_path.with_suffix(f".{width}.bin")
+    try:
+        if sidecar.stat().st_mtime_ns >= image_path.stat().st_mtime_ns:
+            data = sidecar.read_bytes()
+            if data and len(data) % width_bytes == 0:
+                return data
+    except OSError:
+        pass
+    data = _rasterize(image_path, width)
+    try:
+        sidecar.write_bytes(data)
+    except OSError:
+        pass
+    return data
+
+
+def write_phm(path: Path, data: bytes, width: int) -> None:
+    """Write a packed bitmap as an uncompressed .phm file."""
+    height = len(data) // ((width + 7) // 8)
+    header = (
+        PHM_MAGIC
+        + width.to_bytes(4, "little")
+        + height.to_bytes(4, "little")
+        + bytes(4)
+    )
+    Path(path).write_bytes(header + data)
+
+
+def read_phm(path: Path) -> tuple[bytes, int]:
+    """Return (bitmap, width) from a .phm file, with no image decoding."""
+    raw = Path(path).read_bytes()
+    if len(raw) < _PHM_HEADER_SIZE or raw[:4] != PHM_MAGIC:
+        raise ValueError(f"Not a .phm bitmap: {path}")
+    width = int.from_bytes(raw[4:8], "little")
+    height = int.from_bytes(raw[8:12], "little")
+    data = raw[_PHM_HEADER_SIZE:]
+    if not width or len(data) != height * ((width + 7) // 8):
+        raise ValueError(f"Truncated .phm bitmap: {path}")
+    return data, width
+
+
+class _BufferedTransport:
+    """Coalesce small writes into chunk_size blocks before they hit the link."""
+
+    def __init__(self, raw, chunk_size: int):
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        # While holding, everything waits for an explicit flush().
+        self.holding = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if not self.holding and len(self._buffer) >= self._chunk_size:
+            self._drain(self._chunk_size)
+        return len(data)
+
+    def _drain(self, chunk_size: int) -> None:
+        view = memoryview(self._buffer)
+        sent = 0
+        while len(self._buffer) - sent >= chunk_size:
+            self._raw.write(view[sent:sent + chunk_size])
+            sent += chunk_size
+        view.release()
+        del self._buffer[:sent]
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._raw.write(bytes(self._buffer))
+            self._buffer.clear()
+        if hasattr(self._raw, "flush"):
+            self._raw.flush()
+
+    def discard(self) -> None:
+        self._buffer.clear()
+
+    def __getattr__(self, name):
+        # Anything waiting on a reply must see our pending commands first.
+        if name.startswith("read"):
+            self.flush()
+        return getattr(self._raw, name)
+
+
+class _BufferedPrinterMixin:
+    """
+    Printer whose ESC/POS commands and raster rows go out in bulk writes.
+
+    Buffering only changes how the library's bytes reach _port, so it is
+    always on. print_raw_bitmap is a hand-rolled GS v 0 raster that has not
+    been verified on an M02S, so it is only used with --raw.
+    """
+
+    def __init__(self, *args, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        raw = getattr(self, _TRANSPORT_ATTR, None)
+        if not callable(getattr(raw, "write", None)):
+            raise RuntimeError(
+                f"phomemo_m02s Printer has no writable {_TRANSPORT_ATTR!r}; "
+                "update _TRANSPORT_ATTR to match the installed library"
+            )
+        self._transport = _BufferedTransport(raw, chunk_size)
+        setattr(self, _TRANSPORT_ATTR, self._transport)
+
+    def print_raw_bitmap(self, data: bytes, width: int) -> None:
+        """Send a pre-packed 1-bit bitmap as ESC/POS raster bands."""
+        width_bytes = (width + 7) // 8
+        rows = len(data) // width_bytes
+        parts = []
+        for start in range(0, rows, _RASTER_BAND_ROWS):
+            band_rows = min(_RASTER_BAND_ROWS, rows - start)
+            parts.append(
+                b"\x1dv0\x00"
+                + width_bytes.to_bytes(2, "little")
+                + band_rows.to_bytes(2, "little")
+            )
+            parts.append(data[start * width_bytes:(start + band_rows) * width_bytes])
+        self._transport.write(b"".join(parts))
+
+    def print_matrix(self, matrix: "np.ndarray", width: int) -> None:
+        """Print a QR module matrix directly, with no image file involved."""
+        self.print_raw_bitmap(matrix_to_bitmap(matrix, width), width)
+
+    def flush(self) -> None:
+        self._transport.flush()
+
+    @contextmanager
+    def batch(self):
+        """Queue every command in the block and send them as one write.
+
+        If the block raises, the queued commands are dropped rather than
+        sending the printer half a job.
+        """
+        transport = self._transport
+        transport.holding = True
+        try:
+            yield self
+        except BaseException:
+            transport.discard()
+            raise
+        else:
+            transport.flush()
+        finally:
+            transport.holding = False
+
+
+@lru_cache(maxsize=None)
+def _printer_class():
+    """Build BufferedPrinter on first use, importing phomemo_m02s only then."""
+    from phomemo_m02s.printer import Printer
+
+    class BufferedPrinter(_BufferedPrinterMixin, Printer):
+        pass
+
+    return BufferedPrinter
+
+
+def _default_width() -> int:
+    return _printer_class().MAX_WIDTH
+
+
+def _open_printer(args: SimpleNamespace):
+    """
+    Connect to the printer, or report why not and return None.
+
+    Writes are buffered either way; only --raw swaps Printer.print_image
+    for print_raw_bitmap.
+    """
+    try:
+        return _printer_class()(args.port, args.mac, chunk_size=args.chunk_size)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return None
+
+
+@contextmanager
+def _print_job(printer):
+    """Set up alignment around the block and send the job as one write."""
+    with printer.batch() as p:
+        p.initialize()
+        p.reset()
+        p.align_center()
+        yield p
+        p.reset()
+
+
+# Every CLI option once: name -> (dest, type, default, help). A type of
+# bool means a store_true flag. Both parsers below are built from this.
+_OPTIONS = {
+    "--width": ("width", int, None, None),
+    "--port": ("port", str, "/dev/tty.M02S", None),
+    "--mac": ("mac", str, None, None),
+    "--convert-only": ("convert_only", bool, False, None),
+    "--chunk-size": ("chunk_size", int, DEFAULT_CHUNK_SIZE, None),
+    "--raw": (
+        "raw", bool, False,
+        "Send a pre-packed GS v 0 raster instead of Printer.print_image "
+        "(experimental, unverified on the M02S)",
+    ),
+    "--url": (
+        "url", str, None,
+        "Encode and print this URL directly instead of an image file",
+    ),
+    "--raw-out": (
+        "raw_out", str, None,
+        "Also write the packed bitmap to this .phm file "
+        "(with --convert-only, instead of a PNG)",
+    ),
+}
+
+
+def _build_parser():
+    import argparse
 
     parser = argparse.ArgumentParser(
         description="Print a QR PNG to a Phomemo M02S printer."
     )
-    parser.add_argument("image", nargs="?", default=str(default_image))
-    parser.add_argument("--width", type=int, default=Printer.MAX_WIDTH)
-    parser.add_argument("--port", default="/dev/tty.M02S")
-    parser.add_argument("--mac", default=None)
-    parser.add_argument("--convert-only", action="store_true", default=False)
-
-    args = parser.parse_args()
-    image_path = Path(args.image)
+    # No default here: main() falls back to DEFAULT_IMAGE only when reading,
+    # so --url --convert-only can't overwrite the committed PNG.
+    parser.add_argument("image", nargs="?", default=None)
+    for name, (dest, kind, default, help_text) in _OPTIONS.items():
+        if kind is bool:
+            parser.add_argument(name, dest=dest, action="store_true", default=default, help=help_text)
+        else:
+            parser.add_argument(name, dest=dest, type=kind, default=default, help=help_text)
+    return parser
+
+
+def parse_args(argv=None) -> SimpleNamespace:
+    """
+    Parse the CLI; same attributes as the argparse parser it falls back to.
+
+    Fast path for plain invocations only: anything unusual (--help, typos,
+    abbreviations, a value that looks like an option) is handed to argparse
+    so it gives the same result or usage error.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = SimpleNamespace(image=None)
+    for dest, _kind, default, _help in _OPTIONS.values():
+        setattr(args, dest, default)
+    positional = []
+    remaining = iter(argv)
+    try:
+        for arg in remaining:
+            name, eq, value = arg.partition("=")
+            option = _OPTIONS.get(name)
+            if option is None:
+                if arg.startswith("-") and arg != "-":
+                    raise ValueError(arg)
+                positional.append(arg)
+                continue
+            dest, kind, _default, _help = option
+            if kind is bool:
+                if eq:
+                    raise ValueError(arg)
+                setattr(args, dest, True)
+                continue
+            if not eq:
+                value = next(remaining)
+                if value.startswith("-"):
+                    raise ValueError(value)
+            setattr(args, dest, kind(value))
+        if len(positional) > 1:
+            raise ValueError(positional)
+    except (ValueError, StopIteration):
+        # argparse prints help or the usual usage error (and exits)
+        return _build_parser().parse_args(argv)
+    if positional:
+        args.image = positional[0]
+    return args
+
+
+def print_url(args: SimpleNamespace) -> int:
+    """Generate a QR for args.url and print it (with --raw, without a PNG)."""
+    from generate_qr import qr_matrix, render_qr
+
+    if args.convert_only and not args.raw_out:
+        if args.image is None:
+            print("--url --convert-only needs an output path, e.g. out.png", file=sys.stderr)
+            return 2
+        # Debugging path: keep a file to look at. Level 1 is plenty for a QR.
+        render_qr(args.url).save(args.image, compress_level=1)
+        return 0
+
+    matrix = qr_matrix(args.url)
+    if args.raw_out:
+        width = args.width or _default_width()
+        write_phm(Path(args.raw_out), matrix_to_bitmap(matrix, width), width)
+        if args.convert_only:
+            return 0
+
+    printer = _open_printer(args)
+    if printer is None:
+        return 1
+    width = args.width or printer.MAX_WIDTH
+    if args.raw:
+        with _print_job(printer) as job:
+            job.print_matrix(matrix, width)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        png_path = Path(tmp) / "qr.png"
+        render_qr(args.url).save(png_path, compress_level=1)
+        with _print_job(printer) as job:
+            job.print_image(str(png_path), width=width)
+
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.url:
+        return print_url(args)
+
+    image_path = Path(args.image or DEFAULT_IMAGE)
     if not image_path.exists():
         print(f"Image not found: {image_path}", file=sys.stderr)
         return 2
 
+    data = None
+    if image_path.suffix == PHM_SUFFIX:
+        # Already packed at its print width: no PIL, no NumPy
+        try:
+            data, width = read_phm(image_path)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 2
+        if args.width and args.width != width:
+            print(f"{image_path} is {width} dots wide, not {args.width}", file=sys.stderr)
+            return 2
+    else:
+        width = args.width or _default_width()
+
+    if args.raw_out:
+        if data is None:
+            data = load_bitmap(image_path, width)
+        write_phm(Path(args.raw_out), data, width)
+
     if args.convert_only:
-        phomemo_m02s._image_helper.preprocess_image(
-            str(image_path), width=args.width, save=True
-        )
+        if not args.raw_out:
+            import phomemo_m02s._image_helper
+
+            phomemo_m02s._image_helper.preprocess_image(
+                str(image_path), width=width, save=True
+            )
+            if args.raw:
+                # Only the --raw print path reads the .bin sidecar
+                load_bitmap(image_path, width)
         return 0
 
-    printer = Printer(args.port, args.mac)
-    printer.initialize()
-    printer.reset()
-    printer.align_center()
-    printer.print_image(str(image_path), width=args.width)
-    printer.reset()
+    if image_path.suffix == PHM_SUFFIX and not args.raw:
+        print(f"{image_path} is a raw bitmap; print it with --raw", file=sys.stderr)
+        return 2
+
+    printer = _open_printer(args)
+    if printer is None:
+        return 1
+    with _print_job(printer) as job:
+        if args.raw:
+            job.print_raw_bitmap(data or load_bitmap(image_path, width), width)
+        else:
+            job.print_image(str(image_path), width=width)
 
     return 0
 